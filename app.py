@@ -2,20 +2,28 @@
 Main Flask application for Text Extractor and Translator.
 """
 import os
+import json
 import time
-from flask import Flask, request, render_template, jsonify, send_file
+from flask import Flask, Response, request, render_template, jsonify, send_file, stream_with_context
 from werkzeug.utils import secure_filename
 
+import config
+
+# TensorFlow reads CUDA_VISIBLE_DEVICES when it is imported, so GPU usage
+# has to be disabled before any model module is loaded
+if not config.Config.USE_GPU:
+    os.environ.setdefault('CUDA_VISIBLE_DEVICES', '-1')
+
 from models.ocr_model import OCRModel
-from models.translation_model import TranslationModel
+from models.translation_model import get_translation_model
 from models.ml_enhancement import MLEnhancementModel
 from services.image_preprocessing import ImagePreprocessor
-from services.text_extraction import TextExtractionService
+from services.text_extraction import TextExtractionService, IMAGE_EXTENSIONS
+from services.extraction_pool import ExtractionPool
 from services.translation_service import TranslationService
 from utils.file_handler import FileHandler
 from utils.error_handler import handle_error
 from utils.performance_metrics import track_performance
-import config
 
 app = Flask(__name__)
 app.config.from_object(config.Config)
@@ -25,7 +33,11 @@ file_handler = FileHandler(app.config['UPLOAD_FOLDER'])
 image_preprocessor = ImagePreprocessor()
 ocr_model = OCRModel()
 ml_model = MLEnhancementModel()
-translation_model = TranslationModel()
+translation_model = get_translation_model(
+    redis_url=app.config['REDIS_URL'] if app.config['CACHE_ENABLED'] else None,
+    cache_ttl=app.config['TRANSLATION_CACHE_TTL'],
+    lid_model_path=app.config['LANGUAGE_ID_MODEL_PATH']
+)
 
 text_extraction_service = TextExtractionService(
     ocr_model=ocr_model,
@@ -33,7 +45,87 @@ text_extraction_service = TextExtractionService(
     preprocessor=image_preprocessor
 )
 
-translation_service = TranslationService(translation_model)
+# Run OCR on worker processes so request threads stay responsive. The
+# workers are forked here, so this must come before anything that starts
+# threads (e.g. the translation batcher)
+extraction_pool = None
+if app.config['PARALLEL_PROCESSING']:
+    extraction_pool = ExtractionPool(
+        text_extraction_service,
+        max_workers=app.config['OCR_WORKERS'] or None,
+        page_threads=app.config['OCR_PAGE_THREADS'] or None
+    )
+
+translation_service = TranslationService(
+    translation_model,
+    batch_size=app.config['TRANSLATION_BATCH_SIZE'],
+    max_latency=app.config['TRANSLATION_BATCH_LATENCY']
+)
+
+def save_upload(file):
+    """
+    Save an uploaded file, keeping image contents in memory for inline extraction.
+    
+    Returns:
+        tuple: (file_path, data) where data is None unless the upload is an
+            image that will be extracted in this process
+    """
+    if not extraction_pool and os.path.splitext(file.filename)[1].lower() in IMAGE_EXTENSIONS:
+        return file_handler.save_upload_with_data(file)
+    
+    return file_handler.save_upload(file), None
+
+def run_extraction(file_path, source_lang='auto', enhance=True, data=None):
+    """
+    Extract text on the worker pool if enabled, otherwise inline.
+    
+    Inline extraction decodes `data`, image contents already in memory,
+    instead of reading the saved file back from disk.
+    """
+    if extraction_pool:
+        return extraction_pool.extract_text(
+            file_path,
+            source_lang=source_lang,
+            enhance=enhance,
+            timeout=app.config['OCR_JOB_TIMEOUT']
+        )
+    
+    return text_extraction_service.extract_text(
+        file_path,
+        source_lang=source_lang,
+        enhance=enhance,
+        data=data
+    )
+
+def stream_extraction(file_path, source_lang, enhance, start_time, filename, data=None):
+    """
+    Generate server-sent events with extraction results for each page.
+    
+    Emits a 'page' event per page as it completes, then a 'complete' event
+    with the aggregate confidence and processing time.
+    """
+    def event(name, data):
+        return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+    
+    confidences = []
+    try:
+        for page_index, text, confidence in text_extraction_service.iter_extract_text(
+            file_path,
+            source_lang=source_lang,
+            enhance=enhance,
+            data=data
+        ):
+            confidences.append(confidence)
+            yield event('page', {'page': page_index, 'text': text, 'confidence': confidence})
+        
+        yield event('complete', {
+            'confidence': sum(confidences) / len(confidences) if confidences else 0.0,
+            'processing_time': time.time() - start_time,
+            'filename': filename
+        })
+    except Exception as e:
+        app.logger.error(f"Streaming extraction failed: {str(e)}")
+        yield event('error', {'error': 'An unexpected error occurred'})
 
 @app.route('/')
 def index():
@@ -61,16 +153,25 @@ def extract_text():
         # Get parameters
         source_lang = request.form.get('source_lang', 'auto')
         enhance = request.form.get('enhance', 'true').lower() == 'true'
+        stream = request.form.get('stream', 'false').lower() == 'true'
         
         # Save and process file
         start_time = time.time()
-        file_path = file_handler.save_upload(file)
+        file_path, data = save_upload(file)
+        
+        # Stream per-page results as server-sent events if requested
+        if stream:
+            return Response(
+                stream_with_context(stream_extraction(file_path, source_lang, enhance, start_time, file.filename, data)),
+                mimetype='text/event-stream'
+            )
         
         # Extract text
-        extracted_text, confidence = text_extraction_service.extract_text(
-            file_path, 
+        extracted_text, confidence = run_extraction(
+            file_path,
             source_lang=source_lang,
-            enhance=enhance
+            enhance=enhance,
+            data=data
         )
         
         processing_time = time.time() - start_time
@@ -135,21 +236,25 @@ def api_extract():
         
         # Save and process file
         start_time = time.time()
-        file_path = file_handler.save_upload(file)
+        file_path, data = save_upload(file)
         
         # Extract text
-        extracted_text, confidence = text_extraction_service.extract_text(
-            file_path, 
+        extracted_text, confidence = run_extraction(
+            file_path,
             source_lang=source_lang,
-            enhance=enhance
+            enhance=enhance,
+            data=data
         )
         
+        # Detect the language once, for both translation and the response
+        detected_lang = source_lang if source_lang != 'auto' else translation_service.detect_language(extracted_text)
+        
         # Translate if target language is specified
         translated_text = None
         if target_lang and target_lang != source_lang:
             translated_text = translation_service.translate(
                 extracted_text,
-                source_lang=source_lang,
+                source_lang=detected_lang,
                 target_lang=target_lang
             )
         
@@ -160,7 +265,7 @@ def api_extract():
             'status': 'success',
             'original_text': extracted_text,
             'confidence_score': confidence,
-            'language_detected': source_lang if source_lang != 'auto' else translation_service.detect_language(extracted_text),
+            'language_detected': detected_lang,
             'processing_time': f"{processing_time:.2f}s"
         }
         
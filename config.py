@@ -29,11 +29,19 @@ class Config:
     # Translation services
     GOOGLE_TRANSLATE_API_KEY = os.environ.get('GOOGLE_TRANSLATE_API_KEY', '')
     DEEPL_API_KEY = os.environ.get('DEEPL_API_KEY', '')
+    LANGUAGE_ID_MODEL_PATH = os.environ.get('LANGUAGE_ID_MODEL_PATH', 'models/trained/lid.176.ftz')
     
     # Performance configuration
     BATCH_SIZE = int(os.environ.get('BATCH_SIZE', '4'))
     PARALLEL_PROCESSING = os.environ.get('PARALLEL_PROCESSING', 'True') == 'True'
+    OCR_WORKERS = int(os.environ.get('OCR_WORKERS', '0'))  # 0 uses the CPU count
+    OCR_PAGE_THREADS = int(os.environ.get('OCR_PAGE_THREADS', '0'))  # Per worker; 0 splits the CPUs between workers
+    OCR_JOB_TIMEOUT = float(os.environ.get('OCR_JOB_TIMEOUT', '300'))
     CACHE_ENABLED = os.environ.get('CACHE_ENABLED', 'True') == 'True'
+    REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+    TRANSLATION_BATCH_SIZE = int(os.environ.get('TRANSLATION_BATCH_SIZE', '16'))
+    TRANSLATION_BATCH_LATENCY = float(os.environ.get('TRANSLATION_BATCH_LATENCY', '0.05'))
+    TRANSLATION_CACHE_TTL = int(os.environ.get('TRANSLATION_CACHE_TTL', str(14 * 24 * 3600)))
     
     # Supported languages (ISO 639-1 codes)
     SUPPORTED_LANGUAGES = [
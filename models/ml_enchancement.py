@@ -4,40 +4,67 @@ ML enhancement model for improving OCR text extraction accuracy.
 import os
 import re
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import load_model
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Texts at or above this OCR confidence and longer than the minimum length
+# skip enhancement entirely
+HIGH_CONFIDENCE_THRESHOLD = 0.95
+HIGH_CONFIDENCE_MIN_LENGTH = 10_000
+
 class MLEnhancementModel:
     """
     Machine learning model for enhancing OCR text extraction accuracy.
     Uses a TensorFlow model to correct and improve extracted text.
+    
+    Models saved as Keras files are loaded with Keras; '.tflite' models
+    (e.g. produced by convert_to_tflite) are loaded into the TFLite
+    interpreter, which is considerably faster for quantized CPU inference.
     """
     
-    def __init__(self, model_path=None, use_gpu=False):
+    def __init__(self, model_path=None, use_gpu=False, num_threads=None):
         """
         Initialize the ML enhancement model.
         
         Args:
-            model_path (str, optional): Path to the trained TensorFlow model.
+            model_path (str, optional): Path to the trained TensorFlow model
+                (Keras '.h5' or TFLite '.tflite').
             use_gpu (bool, optional): Whether to use GPU for inference.
+            num_threads (int, optional): Number of CPU threads for TFLite inference.
         """
         self.model_path = model_path
         self.model = None
+        self.interpreter = None
         self.use_gpu = use_gpu
+        self.num_threads = num_threads
         self.initialized = False
         
-        # Common OCR error patterns
-        self.common_errors = {
-            r'([0-9])([A-Za-z])': r'\1 \2',  # Fix stuck numbers and letters
-            r'([A-Za-z])([0-9])': r'\1 \2',  # Fix stuck letters and numbers
-            r'l([^a-z])': r'I\1',            # Common l/I confusion
-            r'(\w)\.(\w)': r'\1. \2',        # Fix merged sentences
-            r'\s{2,}': ' ',                  # Normalize spaces
+        # Common OCR error patterns, compiled once and applied in order
+        self._compiled_errors = [
+            (re.compile(pattern), replacement) for pattern, replacement in [
+                (r'([0-9])([A-Za-z])', r'\1 \2'),  # Fix stuck numbers and letters
+                (r'([A-Za-z])([0-9])', r'\1 \2'),  # Fix stuck letters and numbers
+                (r'l([^a-z])', r'I\1'),            # Common l/I confusion
+                (r'(\w)\.(\w)', r'\1. \2'),        # Fix merged sentences
+                (r'\s{2,}', ' '),                  # Normalize spaces
+            ]
+        ]
+        
+        # Common character confusions
+        char_replacements = {
+            '0': 'O', 'O': 'O',  # Normalize O/0
+            'l': 'l', 'I': 'I',  # Normalize l/I
+            ';': ';',            # Fix semicolons
+            '`': "'",            # Fix backticks
+            '´': "'",            # Fix acute accents as apostrophes
         }
         
+        # Translation table with only the entries that change a character
+        self._char_table = str.maketrans({
+            old: new for old, new in char_replacements.items() if old != new
+        })
+        
         # Try to initialize model if path is provided
         if model_path and os.path.exists(model_path):
             self._initialize_model()
@@ -45,12 +72,24 @@ class MLEnhancementModel:
     def _initialize_model(self):
         """Initialize and load the TensorFlow model."""
         try:
-            # Configure GPU usage
+            # Import TensorFlow only when a model is actually loaded
+            import tensorflow as tf
+            from tensorflow.keras.models import load_model
+            
+            # Configure GPU usage (CUDA_VISIBLE_DEVICES is set at startup;
+            # hide any GPUs TensorFlow still sees in case it was not)
             if not self.use_gpu:
-                os.environ['CUDA_VISIBLE_DEVICES'] = '-1'  # Disable GPU
+                tf.config.set_visible_devices([], 'GPU')
             
             # Load the model
-            self.model = load_model(self.model_path)
+            if self.model_path.endswith('.tflite'):
+                self.interpreter = tf.lite.Interpreter(
+                    model_path=self.model_path,
+                    num_threads=self.num_threads
+                )
+                self.interpreter.allocate_tensors()
+            else:
+                self.model = load_model(self.model_path)
             self.initialized = True
             logger.info("ML enhancement model loaded successfully")
             
@@ -58,6 +97,43 @@ class MLEnhancementModel:
             logger.warning(f"Failed to load ML enhancement model: {str(e)}")
             logger.warning("Will fall back to rule-based enhancement only")
     
+    @staticmethod
+    def convert_to_tflite(keras_model_path, output_path, representative_dataset=None):
+        """
+        Convert a Keras model to a quantized TFLite model for CPU inference.
+        
+        Without a representative dataset, weights are quantized to int8 and
+        activations stay float (dynamic range quantization). With one, the
+        model is fully quantized to int8.
+        
+        Args:
+            keras_model_path (str): Path to the Keras model.
+            output_path (str): Path to write the '.tflite' model to.
+            representative_dataset (callable, optional): Generator function yielding
+                lists of sample input arrays used to calibrate activation ranges.
+            
+        Returns:
+            str: Path to the written TFLite model.
+        """
+        import tensorflow as tf
+        
+        model = tf.keras.models.load_model(keras_model_path)
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        
+        if representative_dataset:
+            converter.representative_dataset = representative_dataset
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+            converter.inference_input_type = tf.int8
+            converter.inference_output_type = tf.int8
+        
+        with open(output_path, 'wb') as f:
+            f.write(converter.convert())
+        
+        logger.info(f"Saved quantized TFLite model: {output_path}")
+        
+        return output_path
+    
     def enhance_text(self, text, confidence):
         """
         Enhance OCR-extracted text using machine learning and rule-based corrections.
@@ -72,6 +148,11 @@ class MLEnhancementModel:
         if not text or not text.strip():
             return text, confidence
             
+        # Long, high-confidence text (typically a clean scan) gains little from
+        # the correction passes, so skip them
+        if confidence >= HIGH_CONFIDENCE_THRESHOLD and len(text) > HIGH_CONFIDENCE_MIN_LENGTH:
+            return text, min(1.0, confidence * 1.02)
+            
         # Apply rule-based corrections first
         enhanced_text = self._apply_rule_based_corrections(text)
         
@@ -103,24 +184,11 @@ class MLEnhancementModel:
         enhanced_text = text
         
         # Apply regex-based corrections
-        for pattern, replacement in self.common_errors.items():
-            enhanced_text = re.sub(pattern, replacement, enhanced_text)
-        
-        # Fix common character confusions
-        char_replacements = {
-            '0': 'O', 'O': 'O',  # Normalize O/0
-            'l': 'l', 'I': 'I',  # Normalize l/I
-            ';': ';',            # Fix semicolons
-            '`': "'",            # Fix backticks
-            '´': "'",            # Fix acute accents as apostrophes
-        }
+        for pattern, replacement in self._compiled_errors:
+            enhanced_text = pattern.sub(replacement, enhanced_text)
         
-        # Apply context-aware character corrections
-        for old, new in char_replacements.items():
-            # Implement more sophisticated replacements based on context
-            # This is a simplified example
-            if old != new:
-                enhanced_text = enhanced_text.replace(old, new)
+        # Fix common character confusions in a single pass
+        enhanced_text = enhanced_text.translate(self._char_table)
         
         return enhanced_text
     
@@ -145,4 +213,4 @@ class MLEnhancementModel:
         # with a note that ML would be applied here
         logger.info("Applied ML enhancement to text")
         
-        return text  # In reality, this would be the ML-corrected text
\ No newline at end of file
+        return text  # In reality, this would be the ML-corrected text
@@ -2,29 +2,59 @@
 OCR model implementation using Tesseract.
 """
 import os
+import atexit
+import queue
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pytesseract
 from PIL import Image
-import pdfplumber
 import numpy as np
 import cv2
 import logging
 
+# Pages are OCR'd in parallel threads, so keep Tesseract's OpenMP pool
+# single-threaded to avoid oversubscribing the CPU. Must be set before
+# the Tesseract library is loaded.
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+try:
+    from tesserocr import PyTessBaseAPI, PSM
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Maximum number of page images handed to a single Tesseract invocation.
+# Tesseract has been reported to hang on image lists longer than ~50 entries.
+PDF_OCR_BATCH_SIZE = 32
+
+# Resolution (DPI) used to render PDF pages for OCR; Tesseract works best around 300 DPI
+PDF_OCR_RESOLUTION = 300
+
+# Maximum number of rendered pages waiting for OCR, bounding memory use
+PDF_RASTER_QUEUE_SIZE = 4
+
 class OCRModel:
     """
     Optical Character Recognition model using Tesseract OCR.
     """
     
-    def __init__(self, tesseract_cmd=None, lang='eng'):
+    def __init__(self, tesseract_cmd=None, lang='eng', page_threads=None):
         """
         Initialize the OCR model.
         
         Args:
             tesseract_cmd (str, optional): Path to Tesseract executable.
             lang (str, optional): Default language for OCR. Defaults to 'eng'.
+            page_threads (int, optional): Maximum number of pages OCR'd at once,
+                which also caps the Tesseract engines kept per language.
+                Defaults to the CPU count.
         """
         self.lang = lang
+        self.page_threads = page_threads or os.cpu_count() or 1
         self.language_mapping = {
             'en': 'eng',     'es': 'spa',     'fr': 'fra',
             'de': 'deu',     'it': 'ita',     'pt': 'por',
@@ -37,6 +67,19 @@ class OCRModel:
             'id': 'ind'
         }
         
+        # Pools of idle long-lived Tesseract API instances keyed by
+        # Tesseract language code; each instance is used by one thread at a time
+        self._apis = {}
+        self._api_counts = {}
+        self._all_apis = []
+        self._apis_lock = threading.Lock()
+        atexit.register(self.close)
+        
+        # A process forked while another thread holds the lock or has an API
+        # checked out would inherit them in that state, so start afresh
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_apis)
+        
         # Set Tesseract command if provided
         if tesseract_cmd:
             pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
@@ -54,30 +97,53 @@ class OCRModel:
         Extract text from an image using Tesseract OCR.
         
         Args:
-            image: PIL Image or numpy array
+            image: Path to an image file, PIL Image or numpy array
             lang (str, optional): Language code for OCR.
         
         Returns:
             tuple: (extracted_text, confidence_score)
         """
-        # Convert numpy array to PIL Image if needed
-        if isinstance(image, np.ndarray):
-            image = Image.fromarray(image)
+        # Reduce color arrays (OpenCV BGR order) to grayscale once
+        if isinstance(image, np.ndarray) and image.ndim == 3:
+            conversion = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            image = cv2.cvtColor(image, conversion)
         
         # Use provided language or default
         ocr_lang = self._map_language_code(lang) if lang else self.lang
         
+        # Reuse a loaded Tesseract engine instead of spawning a subprocess
+        if TESSEROCR_AVAILABLE:
+            with self._acquire_api(ocr_lang) as api:
+                self._set_api_image(api, image)
+                text = api.GetUTF8Text()
+                confidences = api.AllWordConfidences()
+            
+            full_text = ' '.join(text.split())
+            confidence_score = sum(confidences) / len(confidences) / 100 if confidences else 0.0
+            
+            return full_text, confidence_score
+        
+        # pytesseract reads file paths directly; arrays are 8-bit grayscale by now
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        
         # Extract text with confidence data
         data = pytesseract.image_to_data(image, lang=ocr_lang, output_type=pytesseract.Output.DICT)
         
-        # Extract text and calculate mean confidence
-        full_text = ' '.join([word for word in data['text'] if word.strip()])
+        # Collect words and accumulate valid confidence values in a single pass
+        words = []
+        conf_total = 0
+        conf_count = 0
+        for conf, text in zip(data['conf'], data['text']):
+            if not text.strip():
+                continue
+            words.append(text)
+            if conf != -1:
+                conf_total += conf
+                conf_count += 1
         
-        # Calculate confidence score from valid confidence values
-        confidences = [conf for conf, text in zip(data['conf'], data['text']) 
-                      if text.strip() and conf != -1]
-        
-        confidence_score = np.mean(confidences) / 100 if confidences else 0.0
+        full_text = ' '.join(words)
+        confidence_score = conf_total / conf_count / 100 if conf_count else 0.0
         
         return full_text, confidence_score
     
@@ -92,24 +158,13 @@ class OCRModel:
         Returns:
             tuple: (extracted_text, confidence_score)
         """
-        extracted_texts = []
-        confidence_scores = []
-        
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                # Try to extract text directly first (if PDF has text layer)
-                text = page.extract_text()
-                
-                if text and text.strip():
-                    # Text layer exists, assign high confidence
-                    extracted_texts.append(text)
-                    confidence_scores.append(0.95)  # High confidence for native text
-                else:
-                    # No text layer, perform OCR on page image
-                    img = page.to_image().original
-                    page_text, page_conf = self.extract_text_from_image(img, lang)
-                    extracted_texts.append(page_text)
-                    confidence_scores.append(page_conf)
+        page_results = {}
+        for index, page_text, page_conf in self.iter_pdf_pages(pdf_path, lang):
+            page_results[index] = (page_text, page_conf)
+        
+        # Reassemble pages in document order
+        extracted_texts = [page_results[index][0] for index in range(len(page_results))]
+        confidence_scores = [page_results[index][1] for index in range(len(page_results))]
         
         # Combine all extracted text
         full_text = '\n\n'.join(extracted_texts)
@@ -117,6 +172,294 @@ class OCRModel:
         
         return full_text, avg_confidence
     
+    def iter_pdf_pages(self, pdf_path, lang=None):
+        """
+        Extract text from a PDF document page by page as results become available.
+        
+        Pages with a text layer are yielded as soon as they are read; pages
+        needing OCR are recognized in parallel and yielded as their OCR
+        completes. Pages are therefore not yielded in order.
+        
+        Args:
+            pdf_path (str): Path to PDF file.
+            lang (str, optional): Language code for OCR.
+        
+        Yields:
+            tuple: (page_index, extracted_text, confidence_score)
+        """
+        if TESSEROCR_AVAILABLE:
+            yield from self._iter_pdf_pages_pipelined(pdf_path, lang)
+            return
+        
+        import pdfplumber
+        
+        ocr_pages = []
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with pdfplumber.open(pdf_path) as pdf:
+                for index, page in enumerate(pdf.pages):
+                    # Try to extract text directly first (if PDF has text layer)
+                    text = page.extract_text()
+                    
+                    if text and text.strip():
+                        # Text layer exists, assign high confidence
+                        yield index, text, 0.95  # High confidence for native text
+                    else:
+                        # No text layer, render the page for batched OCR
+                        image_path = os.path.join(temp_dir, f"page_{index:05d}.png")
+                        self._render_page(page).save(image_path)
+                        ocr_pages.append((index, image_path))
+            
+            if not ocr_pages:
+                return
+            
+            # OCR pages in batches so Tesseract initializes once per batch, and
+            # split them so each page thread runs its own Tesseract process
+            num_workers = min(self.page_threads, len(ocr_pages))
+            batch_size = min(PDF_OCR_BATCH_SIZE, -(-len(ocr_pages) // num_workers))
+            batches = [ocr_pages[start:start + batch_size] for start in range(0, len(ocr_pages), batch_size)]
+            
+            executor = ThreadPoolExecutor(max_workers=num_workers)
+            futures = {}
+            try:
+                futures = {
+                    executor.submit(
+                        self._extract_text_from_image_batch,
+                        [image_path for _, image_path in batch], temp_dir, lang
+                    ): batch
+                    for batch in batches
+                }
+                for future in as_completed(futures):
+                    for (index, _), (page_text, page_conf) in zip(futures[future], future.result()):
+                        yield index, page_text, page_conf
+            finally:
+                # Stop batches that have not started if the caller stopped early
+                for future in futures:
+                    future.cancel()
+                executor.shutdown()
+    
+    def _iter_pdf_pages_pipelined(self, pdf_path, lang=None):
+        """
+        Extract text from a PDF with page rendering and OCR running as overlapping stages.
+        
+        A rasterizer thread reads pages and renders those without a text layer
+        into a bounded queue; OCR threads consume the queue, so rendering of
+        later pages overlaps OCR of earlier ones. An OCR thread is started per
+        rendered page, up to `page_threads`, so documents with few scanned
+        pages use few threads. Results are collected on a second queue and
+        yielded as they arrive.
+        
+        Args:
+            pdf_path (str): Path to PDF file.
+            lang (str, optional): Language code for OCR.
+        
+        Yields:
+            tuple: (page_index, extracted_text, confidence_score)
+        """
+        import pdfplumber
+        
+        page_queue = queue.Queue(maxsize=PDF_RASTER_QUEUE_SIZE)
+        result_queue = queue.Queue()
+        stopped = threading.Event()
+        worker_done = object()
+        rasterizer_done = object()
+        
+        # OCR threads, only ever started by the rasterizer
+        workers = []
+        
+        def rasterize():
+            try:
+                with pdfplumber.open(pdf_path) as pdf:
+                    for index, page in enumerate(pdf.pages):
+                        if stopped.is_set():
+                            break
+                        
+                        # Try to extract text directly first (if PDF has text layer)
+                        text = page.extract_text()
+                        
+                        if text and text.strip():
+                            # Text layer exists, assign high confidence
+                            result_queue.put((index, text, 0.95))  # High confidence for native text
+                        else:
+                            # No text layer, hand the rendered page to the OCR stage
+                            if len(workers) < self.page_threads:
+                                worker = threading.Thread(target=recognize, name=f'pdf-ocr-{len(workers)}', daemon=True)
+                                worker.start()
+                                workers.append(worker)
+                            page_queue.put((index, self._render_page(page)))
+            except Exception as e:
+                result_queue.put(e)
+            finally:
+                for _ in workers:
+                    page_queue.put(None)
+                result_queue.put(rasterizer_done)
+        
+        def recognize():
+            while True:
+                item = page_queue.get()
+                if item is None:
+                    break
+                index, page_image = item
+                try:
+                    page_text, page_conf = self.extract_text_from_image(page_image, lang)
+                    result_queue.put((index, page_text, page_conf))
+                except Exception as e:
+                    result_queue.put(e)
+            result_queue.put(worker_done)
+        
+        threading.Thread(target=rasterize, name='pdf-rasterizer', daemon=True).start()
+        
+        try:
+            # Every page result is queued before the workers finish; the number
+            # of workers is final once the rasterizer is done
+            rasterized = False
+            finished_workers = 0
+            while not rasterized or finished_workers < len(workers):
+                item = result_queue.get()
+                if item is rasterizer_done:
+                    rasterized = True
+                elif item is worker_done:
+                    finished_workers += 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stopped.set()
+    
+    def _render_page(self, page):
+        """
+        Render a PDF page as a grayscale image for OCR.
+        
+        Args:
+            page: pdfplumber page object.
+        
+        Returns:
+            PIL.Image: Grayscale ('L' mode) page image.
+        """
+        return page.to_image(resolution=PDF_OCR_RESOLUTION).original.convert('L')
+    
+    def _extract_text_from_image_batch(self, image_paths, work_dir, lang=None):
+        """
+        Extract text from several images with a single Tesseract invocation.
+        
+        Tesseract accepts a text file listing one image path per line and
+        processes them as consecutive pages, so the engine and language
+        data are loaded once for the whole batch.
+        
+        Args:
+            image_paths (list): Paths to the images to recognize.
+            work_dir (str): Directory for the temporary image list file.
+            lang (str, optional): Language code for OCR.
+        
+        Returns:
+            list: (extracted_text, confidence_score) tuples, one per image.
+        """
+        ocr_lang = self._map_language_code(lang) if lang else self.lang
+        
+        list_path = os.path.join(work_dir, f"batch_{os.path.basename(image_paths[0])}.txt")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(image_paths) + '\n')
+        
+        data = pytesseract.image_to_data(list_path, lang=ocr_lang, output_type=pytesseract.Output.DICT)
+        
+        # Attribute words back to their images via Tesseract's 1-based page_num
+        words = [[] for _ in image_paths]
+        confidences = [[] for _ in image_paths]
+        for page_num, conf, text in zip(data['page_num'], data['conf'], data['text']):
+            if not text.strip():
+                continue
+            page_index = int(page_num) - 1
+            words[page_index].append(text)
+            if conf != -1:
+                confidences[page_index].append(conf)
+        
+        return [
+            (' '.join(page_words), sum(page_confs) / len(page_confs) / 100 if page_confs else 0.0)
+            for page_words, page_confs in zip(words, confidences)
+        ]
+    
+    def _set_api_image(self, api, image):
+        """
+        Hand an image to a Tesseract API without intermediate encoding.
+        
+        Args:
+            api (PyTessBaseAPI): Tesseract API instance
+            image: Path to an image file, PIL Image or 2D uint8 numpy array
+        """
+        if isinstance(image, str):
+            api.SetImageFile(image)
+            return
+        
+        # tesserocr's SetImage encodes PIL images and decodes them again, so
+        # hand over their grayscale pixels directly instead
+        if isinstance(image, Image.Image):
+            image = np.asarray(image if image.mode == 'L' else image.convert('L'))
+        
+        image = np.ascontiguousarray(image)
+        height, width = image.shape
+        api.SetImageBytes(image.tobytes(), width, height, 1, image.strides[0])
+    
+    @contextmanager
+    def _acquire_api(self, ocr_lang):
+        """
+        Borrow a persistent Tesseract API for a language.
+        
+        An idle API is reused if there is one; otherwise a new one is created,
+        unless `page_threads` APIs already exist for the language, in which
+        case this waits for one to be returned.
+        
+        Args:
+            ocr_lang (str): Tesseract language code (e.g., 'eng')
+        
+        Yields:
+            PyTessBaseAPI: API instance reserved for the calling thread
+        """
+        with self._apis_lock:
+            idle_apis = self._apis.setdefault(ocr_lang, queue.SimpleQueue())
+            try:
+                api = idle_apis.get_nowait()
+            except queue.Empty:
+                api = None
+                create = self._api_counts.get(ocr_lang, 0) < self.page_threads
+                if create:
+                    self._api_counts[ocr_lang] = self._api_counts.get(ocr_lang, 0) + 1
+        
+        if api is None and create:
+            try:
+                api = PyTessBaseAPI(lang=ocr_lang, psm=PSM.AUTO)
+            except Exception:
+                with self._apis_lock:
+                    self._api_counts[ocr_lang] -= 1
+                raise
+            with self._apis_lock:
+                self._all_apis.append(api)
+            logger.info(f"Loaded Tesseract API for language: {ocr_lang}")
+        elif api is None:
+            # Every API for this language is in use; wait for one to be returned
+            api = idle_apis.get()
+        
+        try:
+            yield api
+        finally:
+            idle_apis.put(api)
+    
+    def _reset_apis(self):
+        """Forget the API pools in a forked child, which must create its own engines."""
+        self._apis = {}
+        self._api_counts = {}
+        self._all_apis = []
+        self._apis_lock = threading.Lock()
+    
+    def close(self):
+        """Release all persistent Tesseract API instances."""
+        with self._apis_lock:
+            for api in self._all_apis:
+                api.End()
+            self._all_apis.clear()
+            self._api_counts.clear()
+            self._apis.clear()
+    
     def _map_language_code(self, lang_code):
         """
         Map ISO language code to Tesseract language code.
@@ -2,29 +2,66 @@
 Translation model implementation using multiple services.
 """
 import os
-from google.cloud import translate_v2 as translate
-import deepl
+import re
+import hashlib
+import functools
+import threading
+from urllib.parse import quote_plus
 from langdetect import detect
 import logging
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Default lifetime of cached translations and language detections
+CACHE_TTL_SECONDS = 14 * 24 * 3600
+
+# Maximum number of characters sent as a single translation chunk
+MAX_CHUNK_CHARS = 4000
+
+# Per-request limits of the translation APIs; larger batches are split
+# into several requests. DeepL's 128 KiB limit covers the whole request,
+# so leave room for the parameters other than the texts
+DEEPL_MAX_TEXTS_PER_REQUEST = 50
+DEEPL_MAX_TEXT_BYTES = 120 * 1024
+GOOGLE_MAX_TEXTS_PER_REQUEST = 128
+
+# Number of leading characters used to detect the language of a text
+DETECTION_SAMPLE_CHARS = 512
+
+# Whitespace following sentence-ending punctuation
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])(\s+)')
+
 class TranslationModel:
     """
     Translation model that integrates multiple translation services
     with fallback mechanisms.
     """
     
-    def __init__(self, google_api_key=None, deepl_api_key=None):
+    def __init__(self, google_api_key=None, deepl_api_key=None, redis_url=None,
+                 cache_ttl=CACHE_TTL_SECONDS, lid_model_path=None):
         """
         Initialize the translation model with available API keys.
         
         Args:
             google_api_key (str, optional): Google Translate API key.
             deepl_api_key (str, optional): DeepL API key.
+            redis_url (str, optional): Redis URL used to cache translations.
+            cache_ttl (int, optional): Lifetime of cached results in seconds.
+            lid_model_path (str, optional): Path to a fastText language
+                identification model (e.g. lid.176.ftz).
         """
         self.google_client = None
         self.deepl_client = None
+        self.cache = None
+        self.cache_ttl = cache_ttl
+        self.lid_model_path = lid_model_path
+        self._lid_model = None
+        self._lid_lock = threading.Lock()
         self.language_mapping = {
             'en': {'google': 'en', 'deepl': 'EN'},
             'es': {'google': 'es', 'deepl': 'ES'},
@@ -39,9 +76,18 @@ class TranslationModel:
             # Add more languages as needed
         }
         
+        # Flattened DeepL code lookup, avoiding nested lookups per request
+        self._deepl_map = {
+            lang: codes['deepl'] for lang, codes in self.language_mapping.items()
+        }
+        
+        # In-process cache of detections keyed by the text sample
+        self._detect_language_cached = functools.lru_cache(maxsize=4096)(self._detect_language)
+        
         # Initialize Google Translate client if API key is provided
         if google_api_key:
             try:
+                from google.cloud import translate_v2 as translate
                 self.google_client = translate.Client(api_key=google_api_key)
                 logger.info("Google Translate client initialized")
             except Exception as e:
@@ -50,11 +96,26 @@ class TranslationModel:
         # Initialize DeepL client if API key is provided
         if deepl_api_key:
             try:
+                import deepl
                 self.deepl_client = deepl.Translator(deepl_api_key)
                 logger.info("DeepL client initialized")
             except Exception as e:
                 logger.warning(f"Failed to initialize DeepL client: {str(e)}")
         
+        # Initialize Redis cache if a URL is provided
+        if redis_url:
+            if not REDIS_AVAILABLE:
+                logger.warning("redis package not installed. Translation caching disabled.")
+            else:
+                try:
+                    self.cache = redis.Redis.from_url(redis_url, decode_responses=True, socket_timeout=1,
+                                                     socket_connect_timeout=1)
+                    self.cache.ping()
+                    logger.info("Redis translation cache initialized")
+                except Exception as e:
+                    logger.warning(f"Failed to connect to Redis translation cache: {str(e)}")
+                    self.cache = None
+        
         # Check if at least one translation service is available
         if not self.google_client and not self.deepl_client:
             logger.warning("No translation services are available. Translation functionality will be limited.")
@@ -73,17 +134,66 @@ class TranslationModel:
             return 'en'  # Default to English for empty text
         
         try:
-            # Try to use Google Translate for detection if available
-            if self.google_client:
-                result = self.google_client.detect_language(text)
-                return result['language']
-            
-            # Fallback to langdetect
-            return detect(text)
+            return self._detect_language_cached(text[:DETECTION_SAMPLE_CHARS])
         except Exception as e:
             logger.error(f"Language detection failed: {str(e)}")
             return 'en'  # Default to English on failure
     
+    def _detect_language(self, sample):
+        """
+        Detect the language of a text sample, consulting the shared cache first.
+        
+        Errors are raised rather than handled so failed detections are not cached.
+        
+        Args:
+            sample (str): Leading part of the text to detect language for.
+            
+        Returns:
+            str: ISO language code (e.g., 'en').
+        """
+        cache_key = f"detect:v1:{self._hash_text(sample)}"
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Try to use Google Translate for detection if available
+        if self.google_client:
+            result = self.google_client.detect_language(sample)
+            language = result['language']
+        else:
+            lid_model = self._get_lid_model()
+            if lid_model:
+                # fastText expects a single line of text
+                labels, _ = lid_model.predict(sample.replace('\n', ' '), k=1)
+                language = labels[0].replace('__label__', '')
+            else:
+                # Fallback to langdetect
+                language = detect(sample)
+        
+        self._cache_set(cache_key, language)
+        return language
+    
+    def _get_lid_model(self):
+        """
+        Load the fastText language identification model on first use.
+        
+        Returns:
+            fasttext.FastText._FastText: Loaded model, or None if unavailable.
+        """
+        if self._lid_model is None and self.lid_model_path:
+            with self._lid_lock:
+                if self._lid_model is None and self.lid_model_path:
+                    try:
+                        import fasttext
+                        self._lid_model = fasttext.load_model(self.lid_model_path)
+                        logger.info("fastText language identification model loaded")
+                    except Exception as e:
+                        logger.warning(f"Failed to load fastText language identification model: {str(e)}")
+                        logger.warning("Will fall back to langdetect for language detection")
+                        self.lid_model_path = None
+        
+        return self._lid_model
+    
     def translate(self, text, source_lang='auto', target_lang='en'):
         """
         Translate text using available translation services.
@@ -106,19 +216,153 @@ class TranslationModel:
         if source_lang == target_lang:
             return text
             
+        return self.translate_batch([text], source_lang=source_lang, target_lang=target_lang)[0]
+    
+    def translate_batch(self, texts, source_lang, target_lang):
+        """
+        Translate several texts sharing a language pair with one call per service.
+        
+        Args:
+            texts (list): Texts to translate.
+            source_lang (str): Source language code.
+            target_lang (str): Target language code.
+            
+        Returns:
+            list: Translated texts, in the same order as the input.
+        """
+        # Split long texts into sentence-aligned chunks, translated together
+        split_texts = [self._split_into_chunks(text) for text in texts]
+        translated_chunks = self._translate_chunks(
+            [chunk for chunks, _ in split_texts for chunk in chunks],
+            source_lang,
+            target_lang
+        )
+        
+        # Reassemble each text with its original sentence separators
+        results = []
+        position = 0
+        for chunks, separators in split_texts:
+            text_chunks = translated_chunks[position:position + len(chunks)]
+            results.append(''.join(chunk + separator for chunk, separator in zip(text_chunks, separators)))
+            position += len(chunks)
+        
+        return results
+    
+    def _split_into_chunks(self, text):
+        """
+        Split text into chunks of whole sentences of at most MAX_CHUNK_CHARS.
+        
+        A single sentence longer than the limit becomes its own chunk.
+        
+        Args:
+            text (str): Text to split.
+            
+        Returns:
+            tuple: (chunks, separators) where separators[i] is the whitespace
+                that followed chunks[i] in the original text.
+        """
+        parts = SENTENCE_BOUNDARY.split(text)
+        chunks = []
+        separators = []
+        current = ''
+        pending_separator = ''
+        
+        # parts alternates sentence, separator, sentence, ..., sentence
+        for i in range(0, len(parts), 2):
+            sentence = parts[i]
+            if current and len(current) + len(pending_separator) + len(sentence) > MAX_CHUNK_CHARS:
+                chunks.append(current)
+                separators.append(pending_separator)
+                current = sentence
+            else:
+                current = current + pending_separator + sentence
+            pending_separator = parts[i + 1] if i + 1 < len(parts) else ''
+        
+        chunks.append(current)
+        separators.append(pending_separator)
+        
+        return chunks, separators
+    
+    def _translate_chunks(self, texts, source_lang, target_lang):
+        """
+        Translate a list of texts, serving cached translations where available.
+        
+        Args:
+            texts (list): Texts to translate.
+            source_lang (str): Source language code.
+            target_lang (str): Target language code.
+            
+        Returns:
+            list: Translated texts, in the same order as the input.
+        """
+        results = list(texts)
+        candidates = {
+            index: f"translate:v1:{self._hash_text(text)}:{target_lang}:{source_lang}"
+            for index, text in enumerate(texts)
+            if text and text.strip()
+        }
+        
+        # Look up every chunk in a single round trip
+        cache_keys = {}
+        cached_values = self._cache_get_many(list(candidates.values()))
+        for (index, cache_key), cached in zip(candidates.items(), cached_values):
+            if cached is not None:
+                results[index] = cached
+            else:
+                cache_keys[index] = cache_key
+        
+        if not cache_keys:
+            return results
+        
+        translated = self._translate_with_services(
+            [texts[index] for index in cache_keys], source_lang, target_lang
+        )
+        if translated is None:
+            # If all translation services fail, return original text
+            logger.warning("All translation services failed. Returning original text.")
+            return results
+        
+        new_entries = {}
+        for (index, cache_key), translated_text in zip(cache_keys.items(), translated):
+            results[index] = translated_text
+            new_entries[cache_key] = translated_text
+        self._cache_set_many(new_entries)
+        
+        return results
+    
+    def _translate_with_services(self, texts, source_lang, target_lang):
+        """
+        Translate texts with the configured services, in order of preference.
+        
+        Both DeepL and Google Translate accept a list of texts, so the batch
+        is sent in as few requests as each service's size limits allow.
+        
+        Args:
+            texts (list): Texts to translate.
+            source_lang (str): Source language code.
+            target_lang (str): Target language code.
+            
+        Returns:
+            list: Translated texts, or None if every service failed.
+        """
         # Try DeepL first if available (generally higher quality)
         if self.deepl_client:
             try:
-                deepl_source = None if source_lang == 'auto' else self.language_mapping.get(source_lang, {}).get('deepl')
-                deepl_target = self.language_mapping.get(target_lang, {}).get('deepl')
+                deepl_source = None if source_lang == 'auto' else self._deepl_map.get(source_lang)
+                deepl_target = self._deepl_map.get(target_lang)
                 
                 if deepl_target:
-                    result = self.deepl_client.translate_text(
-                        text,
-                        source_lang=deepl_source,
-                        target_lang=deepl_target
-                    )
-                    return result.text
+                    translated = []
+                    for request_texts in self._split_requests(
+                        texts, DEEPL_MAX_TEXTS_PER_REQUEST, DEEPL_MAX_TEXT_BYTES
+                    ):
+                        results = self.deepl_client.translate_text(
+                            request_texts,
+                            source_lang=deepl_source,
+                            target_lang=deepl_target
+                        )
+                        translated.extend(result.text for result in results)
+                    return translated
             except Exception as e:
                 logger.warning(f"DeepL translation failed: {str(e)}")
                 # Fall through to Google Translate
@@ -126,18 +370,133 @@ class TranslationModel:
         # Try Google Translate if available
         if self.google_client:
             try:
-                result = self.google_client.translate(
-                    text,
-                    target_language=target_lang,
-                    source_language=None if source_lang == 'auto' else source_lang
-                )
-                return result['translatedText']
+                translated = []
+                for request_texts in self._split_requests(texts, GOOGLE_MAX_TEXTS_PER_REQUEST):
+                    results = self.google_client.translate(
+                        request_texts,
+                        target_language=target_lang,
+                        source_language=None if source_lang == 'auto' else source_lang
+                    )
+                    translated.extend(result['translatedText'] for result in results)
+                return translated
             except Exception as e:
                 logger.error(f"Google translation failed: {str(e)}")
         
-        # If all translation services fail, return original text
-        logger.warning("All translation services failed. Returning original text.")
-        return text
+        return None
+    
+    def _split_requests(self, texts, max_texts, max_bytes=None):
+        """
+        Split texts into consecutive groups that fit in a single API request.
+        
+        Args:
+            texts (list): Texts to translate.
+            max_texts (int): Maximum number of texts per request.
+            max_bytes (int, optional): Maximum form-encoded size of the texts
+                in one request. A single text over the limit gets a request
+                of its own.
+            
+        Yields:
+            list: Texts for one request, in input order.
+        """
+        group = []
+        group_bytes = 0
+        
+        for text in texts:
+            # Form encoding is the largest encoding the clients send texts in
+            text_bytes = len(quote_plus(text)) if max_bytes else 0
+            if group and (len(group) >= max_texts or (max_bytes and group_bytes + text_bytes > max_bytes)):
+                yield group
+                group = []
+                group_bytes = 0
+            group.append(text)
+            group_bytes += text_bytes
+        
+        if group:
+            yield group
+    
+    def _hash_text(self, text):
+        """
+        Build a compact cache key component for a piece of text.
+        
+        Args:
+            text (str): Text to hash.
+            
+        Returns:
+            str: Hex digest of the text.
+        """
+        return hashlib.md5(text.encode('utf-8')).hexdigest()
+    
+    def _cache_get(self, key):
+        """
+        Look up a cached value, treating cache errors as misses.
+        
+        Args:
+            key (str): Cache key.
+            
+        Returns:
+            str: Cached value, or None on a miss.
+        """
+        if not self.cache:
+            return None
+        
+        try:
+            return self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"Translation cache lookup failed: {str(e)}")
+            return None
+    
+    def _cache_get_many(self, keys):
+        """
+        Look up several cached values in one round trip, treating cache errors as misses.
+        
+        Args:
+            keys (list): Cache keys.
+            
+        Returns:
+            list: Cached values in key order, with None for each miss.
+        """
+        if not self.cache or not keys:
+            return [None] * len(keys)
+        
+        try:
+            return self.cache.mget(keys)
+        except Exception as e:
+            logger.warning(f"Translation cache lookup failed: {str(e)}")
+            return [None] * len(keys)
+    
+    def _cache_set(self, key, value):
+        """
+        Store a value in the cache, ignoring cache errors.
+        
+        Args:
+            key (str): Cache key.
+            value (str): Value to cache.
+        """
+        if not self.cache:
+            return
+        
+        try:
+            self.cache.set(key, value, ex=self.cache_ttl)
+        except Exception as e:
+            logger.warning(f"Translation cache update failed: {str(e)}")
+    
+    def _cache_set_many(self, entries):
+        """
+        Store several values in the cache in one round trip, ignoring cache errors.
+        
+        Args:
+            entries (dict): Values to cache, keyed by cache key.
+        """
+        if not self.cache or not entries:
+            return
+        
+        try:
+            pipeline = self.cache.pipeline(transaction=False)
+            for key, value in entries.items():
+                pipeline.set(key, value, ex=self.cache_ttl)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Translation cache update failed: {str(e)}")
     
     def get_supported_languages(self):
         """
@@ -146,4 +505,32 @@ class TranslationModel:
         Returns:
             list: List of supported language codes.
         """
-        return list(self.language_mapping.keys())
\ No newline at end of file
+        return list(self.language_mapping.keys())
+
+@functools.lru_cache(maxsize=None)
+def get_translation_model(google_api_key=None, deepl_api_key=None, redis_url=None,
+                          cache_ttl=CACHE_TTL_SECONDS, lid_model_path=None):
+    """
+    Get the shared translation model for the given settings.
+    
+    Translation clients, the Redis connection and the language ID model
+    are set up once per process and settings combination.
+    
+    Args:
+        google_api_key (str, optional): Google Translate API key.
+        deepl_api_key (str, optional): DeepL API key.
+        redis_url (str, optional): Redis URL used to cache translations.
+        cache_ttl (int, optional): Lifetime of cached results in seconds.
+        lid_model_path (str, optional): Path to a fastText language
+            identification model (e.g. lid.176.ftz).
+    
+    Returns:
+        TranslationModel: Shared translation model instance.
+    """
+    return TranslationModel(
+        google_api_key=google_api_key,
+        deepl_api_key=deepl_api_key,
+        redis_url=redis_url,
+        cache_ttl=cache_ttl,
+        lid_model_path=lid_model_path
+    )
\ No newline at end of file
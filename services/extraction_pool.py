@@ -0,0 +1,167 @@
+"""
+Worker pool for running text extraction off the request thread.
+"""
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import cv2
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Extraction service used by worker processes, inherited from the parent on fork
+_worker_service = None
+
+def _init_worker(page_threads):
+    """
+    Prepare a forked worker process.
+    
+    Args:
+        page_threads (int): Number of pages each worker OCRs at once
+    """
+    # The parent's OCR model is sized for the whole machine; each worker gets a share
+    _worker_service.ocr_model.page_threads = page_threads
+    
+    # OpenCV sizes its thread pool to every core; with one worker per core
+    # that oversubscribes the CPU during preprocessing
+    cv2.setNumThreads(1)
+
+def _run_extraction(file_path, source_lang, enhance):
+    """
+    Run text extraction inside a worker.
+    
+    Args:
+        file_path (str): Path to the file
+        source_lang (str): Source language code (or 'auto' for detection)
+        enhance (bool): Whether to apply ML enhancement
+    
+    Returns:
+        tuple: (extracted_text, confidence_score)
+    """
+    return _worker_service.extract_text(file_path, source_lang=source_lang, enhance=enhance)
+
+class ExtractionPool:
+    """
+    Bounded pool of worker processes that run text extraction jobs.
+    
+    The pool must be created before the application starts any other
+    threads: workers are forked from the calling process, and a lock held
+    by another thread at fork time would stay locked in every worker.
+    """
+    
+    def __init__(self, extraction_service, max_workers=None, max_pending=None, page_threads=None):
+        """
+        Initialize the extraction pool.
+        
+        Args:
+            extraction_service: Text extraction service instance
+            max_workers (int, optional): Number of worker processes. Defaults to the CPU count.
+            max_pending (int, optional): Maximum number of queued or running jobs.
+                Defaults to twice the number of workers.
+            page_threads (int, optional): Number of pages each worker process OCRs
+                at once. Defaults to the CPU count divided between the workers.
+        """
+        global _worker_service
+        _worker_service = extraction_service
+        
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.page_threads = page_threads or max(1, (os.cpu_count() or 1) // self.max_workers)
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * self.max_workers)
+        self._executor_lock = threading.Lock()
+        self._executor = self._start_executor()
+        
+        logger.info(f"Extraction pool started with {self.max_workers} workers")
+    
+    def _start_executor(self):
+        """
+        Create the executor and start all of its workers.
+        
+        Returns:
+            Executor: Process pool, or a thread pool where fork is unavailable
+        """
+        # Worker processes inherit the loaded service when forked; where fork is
+        # unavailable (e.g. Windows) the service cannot be shared, so use threads
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            logger.warning("fork start method unavailable, running extraction on threads")
+            return ThreadPoolExecutor(max_workers=self.max_workers)
+        
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_worker,
+            initargs=(self.page_threads,)
+        )
+        
+        # A fork-based pool forks every worker on its first submission, so submit
+        # a no-op now rather than letting the first request thread do the forking
+        executor.submit(os.getpid).result()
+        
+        return executor
+    
+    def _restart_executor(self, broken_executor):
+        """
+        Replace a process pool broken by a worker dying (e.g. a Tesseract crash or OOM kill).
+        
+        Args:
+            broken_executor (Executor): The executor that raised BrokenProcessPool
+        """
+        with self._executor_lock:
+            # Another request may already have replaced it
+            if self._executor is not broken_executor:
+                return
+            
+            logger.error("Extraction worker died, restarting the worker pool")
+            broken_executor.shutdown(wait=False)
+            self._executor = self._start_executor()
+    
+    def extract_text(self, file_path, source_lang='auto', enhance=True, timeout=None):
+        """
+        Extract text from a file on a worker and wait for the result.
+        
+        Blocks while the pool already holds `max_pending` jobs; that wait
+        counts towards the timeout.
+        
+        Args:
+            file_path (str): Path to the file
+            source_lang (str): Source language code (or 'auto' for detection)
+            enhance (bool): Whether to apply ML enhancement
+            timeout (float, optional): Maximum time in seconds to wait for a
+                free slot and the result together
+        
+        Returns:
+            tuple: (extracted_text, confidence_score)
+        
+        Raises:
+            concurrent.futures.TimeoutError: If no result arrived within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Timed out waiting for a free extraction worker")
+        try:
+            executor = self._executor
+            try:
+                future = executor.submit(_run_extraction, file_path, source_lang, enhance)
+            except BrokenProcessPool:
+                # The pool broke after an earlier job; replace it and submit again
+                self._restart_executor(executor)
+                executor = self._executor
+                future = executor.submit(_run_extraction, file_path, source_lang, enhance)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        
+        try:
+            return future.result(timeout=None if deadline is None else max(0, deadline - time.monotonic()))
+        except BrokenProcessPool:
+            # This job's worker died; restart the pool so later requests still succeed
+            self._restart_executor(executor)
+            raise
+    
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._executor_lock:
+            self._executor.shutdown(wait=False)
\ No newline at end of file
@@ -8,6 +8,20 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Sauvola binarization needs the contrib modules (opencv-contrib-python, as
+# pinned in requirements.txt); plain opencv-python falls back to adaptiveThreshold
+XIMGPROC_AVAILABLE = hasattr(cv2, 'ximgproc')
+
+# Unsharp mask used to sharpen heavily degraded images
+UNSHARP_SIGMA = 1.0
+UNSHARP_AMOUNT = 0.5
+
+# Width in degrees of the histogram bins used to find the dominant skew angle
+DESKEW_BIN_WIDTH = 0.5
+
+# Sensitivity of Sauvola thresholding to local contrast
+SAUVOLA_K = 0.2
+
 class ImagePreprocessor:
     """
     Service for preprocessing images to improve OCR accuracy.
@@ -26,20 +40,23 @@ class ImagePreprocessor:
             enhance_level (str): Level of enhancement ('auto', 'low', 'medium', 'high')
             
         Returns:
-            PIL.Image: Preprocessed image
+            numpy.ndarray: Preprocessed grayscale image (uint8)
         """
-        # Convert to numpy array if PIL Image
-        if isinstance(image, Image.Image):
-            img_array = np.array(image)
-        else:
-            img_array = image
-            
-        # Convert to grayscale if color image
-        if len(img_array.shape) == 3 and img_array.shape[2] == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = img_array
+        gray = self._to_grayscale(self._to_array(image))
+        
+        return self.preprocess_array(gray, enhance_level)
+    
+    def preprocess_array(self, gray, enhance_level='auto'):
+        """
+        Preprocess a grayscale image array to enhance OCR accuracy.
+        
+        Args:
+            gray (numpy.ndarray): Grayscale image array
+            enhance_level (str): Level of enhancement ('auto', 'low', 'medium', 'high')
             
+        Returns:
+            numpy.ndarray: Preprocessed grayscale image
+        """
         # Determine enhancement level based on image quality
         if enhance_level == 'auto':
             enhance_level = self._determine_enhancement_level(gray)
@@ -54,8 +71,35 @@ class ImagePreprocessor:
         else:
             processed = gray
             
-        # Convert back to PIL Image
-        return Image.fromarray(processed)
+        return processed
+    
+    def _to_array(self, image):
+        """
+        Convert an image to a numpy array.
+        
+        Args:
+            image: PIL Image or numpy array
+            
+        Returns:
+            numpy.ndarray: Image array
+        """
+        if isinstance(image, Image.Image):
+            return np.asarray(image)
+        return image
+    
+    def _to_grayscale(self, img_array):
+        """
+        Convert an image array to grayscale if it is a color image.
+        
+        Args:
+            img_array (numpy.ndarray): Image array
+            
+        Returns:
+            numpy.ndarray: Grayscale image array
+        """
+        if len(img_array.shape) == 3 and img_array.shape[2] == 3:
+            return cv2.cvtColor(img_array, cv2.COLOR_BGR2GRAY)
+        return img_array
     
     def _determine_enhancement_level(self, img):
         """
@@ -89,11 +133,14 @@ class ImagePreprocessor:
         Returns:
             numpy.ndarray: Enhanced image
         """
+        # Every step writes into the same buffer instead of allocating a new image
+        enhanced = np.empty_like(img)
+        
         # Simple contrast adjustment
-        enhanced = cv2.convertScaleAbs(img, alpha=1.1, beta=0)
+        cv2.convertScaleAbs(img, dst=enhanced, alpha=1.1, beta=0)
         
         # Slight noise reduction
-        enhanced = cv2.GaussianBlur(enhanced, (3, 3), 0)
+        cv2.GaussianBlur(enhanced, (3, 3), 0, dst=enhanced)
         
         return enhanced
     
@@ -107,16 +154,29 @@ class ImagePreprocessor:
         Returns:
             numpy.ndarray: Enhanced image
         """
+        # Every step writes into the same buffer instead of allocating a new image
+        enhanced = np.empty_like(img)
+        
         # Stronger contrast adjustment
-        enhanced = cv2.convertScaleAbs(img, alpha=1.3, beta=10)
+        cv2.convertScaleAbs(img, dst=enhanced, alpha=1.3, beta=10)
         
         # Noise reduction
-        enhanced = cv2.GaussianBlur(enhanced, (3, 3), 0)
+        cv2.GaussianBlur(enhanced, (3, 3), 0, dst=enhanced)
+        
+        # Adaptive thresholding for better text/background separation, over a
+        # neighborhood that grows with the image so it spans a similar share of
+        # each character at any resolution
+        block_size = max(11, (img.shape[1] // 80) | 1)
+        if XIMGPROC_AVAILABLE:
+            # Sauvola works from integral images, so its cost does not depend on block size
+            return cv2.ximgproc.niBlackThreshold(
+                enhanced, 255, cv2.THRESH_BINARY, block_size, SAUVOLA_K,
+                binarizationMethod=cv2.ximgproc.BINARIZATION_SAUVOLA
+            )
         
-        # Adaptive thresholding for better text/background separation
-        enhanced = cv2.adaptiveThreshold(
+        cv2.adaptiveThreshold(
             enhanced, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-            cv2.THRESH_BINARY, 11, 2
+            cv2.THRESH_BINARY, block_size, 2, dst=enhanced
         )
         
         return enhanced
@@ -131,18 +191,21 @@ class ImagePreprocessor:
         Returns:
             numpy.ndarray: Enhanced image
         """
-        # Denoise more aggressively
-        denoised = cv2.fastNlMeansDenoising(img, None, 10, 7, 21)
+        # Denoise more aggressively with an edge-preserving bilateral filter,
+        # which keeps stroke edges sharp at a fraction of the cost of NL-means
+        # (the bilateral filter cannot run in place, so it fills the first of two buffers)
+        denoised = cv2.bilateralFilter(img, d=5, sigmaColor=50, sigmaSpace=50)
         
         # Increase contrast significantly
-        enhanced = cv2.convertScaleAbs(denoised, alpha=1.5, beta=30)
+        cv2.convertScaleAbs(denoised, dst=denoised, alpha=1.5, beta=30)
         
-        # Sharpen the image
-        kernel = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
-        enhanced = cv2.filter2D(enhanced, -1, kernel)
+        # Sharpen with an unsharp mask: blur into the second buffer with a
+        # separable Gaussian, then subtract it from the image in one weighted pass
+        enhanced = cv2.GaussianBlur(denoised, (0, 0), UNSHARP_SIGMA)
+        cv2.addWeighted(denoised, 1 + UNSHARP_AMOUNT, enhanced, -UNSHARP_AMOUNT, 0, dst=enhanced)
         
         # Apply Otsu's thresholding
-        _, enhanced = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=enhanced)
         
         return enhanced
     
@@ -154,57 +217,71 @@ class ImagePreprocessor:
             image: PIL Image or numpy array
             
         Returns:
-            PIL.Image: Deskewed image
+            numpy.ndarray: Deskewed image (uint8)
         """
-        # Convert to numpy array if PIL Image
-        if isinstance(image, Image.Image):
-            img_array = np.array(image)
-        else:
-            img_array = image
-            
-        # Convert to grayscale if color image
-        if len(img_array.shape) == 3 and img_array.shape[2] == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = img_array
+        return self.deskew_array(self._to_array(image))
+    
+    def deskew_array(self, img_array):
+        """
+        Deskew an image array to straighten text lines.
+        
+        Args:
+            img_array (numpy.ndarray): Grayscale or color image array
             
+        Returns:
+            numpy.ndarray: Deskewed image array, or the input array if deskewing failed
+        """
+        gray = self._to_grayscale(img_array)
+        
         # Detect skew angle
         try:
             # Apply threshold to get binary image
             _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
             
-            # Find all contours
-            contours, _ = cv2.findContours(binary, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+            # Find line segments along text rows in a single vectorized pass;
+            # the line gap bridges the spaces between characters and words
+            (h, w) = img_array.shape[:2]
+            lines = cv2.HoughLinesP(
+                binary, 1, np.pi / 180, threshold=100,
+                minLineLength=max(w // 8, 20), maxLineGap=20
+            )
             
-            angles = []
-            for contour in contours:
-                # Filter small contours
-                if cv2.contourArea(contour) < 100:
-                    continue
-                    
-                # Get rotated rectangle
-                rect = cv2.minAreaRect(contour)
-                angle = rect[2]
-                
-                # Normalize angle
-                if angle < -45:
-                    angle = 90 + angle
-                    
-                angles.append(angle)
-                
-            # Calculate median angle
-            if angles:
-                median_angle = np.median(angles)
-            else:
-                median_angle = 0
+            # Find the dominant angle of near-horizontal segments
+            skew_angle = 0
+            if lines is not None:
+                # Segments come back as (N, 1, 4) or (N, 4) depending on the OpenCV version
+                x1, y1, x2, y2 = lines.reshape(-1, 4).T.astype(np.float32)
+                dx, dy = x2 - x1, y2 - y1
+                angles = np.degrees(np.arctan2(dy, dx))
+                keep = np.abs(angles) < 45
+                if keep.any():
+                    skew_angle = self._dominant_angle(angles[keep], np.hypot(dx[keep], dy[keep]))
                 
             # Rotate image
-            (h, w) = img_array.shape[:2]
             center = (w // 2, h // 2)
-            M = cv2.getRotationMatrix2D(center, median_angle, 1.0)
-            rotated = cv2.warpAffine(img_array, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
-            
-            return Image.fromarray(rotated)
+            M = cv2.getRotationMatrix2D(center, skew_angle, 1.0)
+            return cv2.warpAffine(img_array, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
         except Exception as e:
             logger.warning(f"Deskewing failed: {str(e)}")
-            return image
\ No newline at end of file
+            return img_array
+    
+    def _dominant_angle(self, angles, lengths):
+        """
+        Find the dominant angle of a set of line segments.
+        
+        Segments are binned into a length-weighted histogram, so a few
+        stray segments (table rules, underlines, picture edges) cannot pull
+        the result away from the bulk of the text lines the way they shift
+        a median. The median of the angles in the heaviest bin refines the
+        estimate below the bin width.
+        
+        Args:
+            angles (numpy.ndarray): Segment angles in degrees, within (-45, 45)
+            lengths (numpy.ndarray): Segment lengths in pixels
+            
+        Returns:
+            float: Dominant angle in degrees
+        """
+        bins = ((angles + 45) / DESKEW_BIN_WIDTH).astype(np.intp)
+        mode_bin = np.argmax(np.bincount(bins, weights=lengths))
+        return float(np.median(angles[bins == mode_bin]))
\ No newline at end of file
@@ -2,6 +2,7 @@
 NLP processing service for improving extracted text quality.
 """
 import re
+import functools
 import logging
 try:
     import spacy
@@ -11,6 +12,18 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Paragraph and formatting patterns
+SINGLE_LINE_BREAK = re.compile(r'(?<!\n)\n(?!\n)')
+MULTIPLE_LINE_BREAKS = re.compile(r'\n{3,}')
+BULLET_PREFIX = re.compile(r'(?<=\n)[\s•-]*(?=•)')
+
+# spaCy components whose output is never used; in en_core_web_sm the NER has
+# its own embedding layer, so the shared tok2vec only feeds the tagger and parser
+UNUSED_SPACY_PIPES = ['tok2vec', 'tagger', 'parser', 'attribute_ruler', 'lemmatizer']
+
+# Entity types whose capitalization is restored
+PROPER_CASE_ENTITY_LABELS = frozenset({'PERSON', 'ORG', 'GPE', 'LOC'})
+
 class NLPProcessor:
     """
     Service for applying NLP techniques to improve extracted text quality.
@@ -28,19 +41,22 @@ class NLPProcessor:
         self.enable_ner = enable_ner
         self.nlp = None
         
-        # Common text patterns to fix
+        # Common text patterns to fix, compiled once
         self.patterns = [
-            (r'(\d+)\.(\d+)', r'\1.\2'),  # Fix decimal numbers
-            (r'(\w+)\s+,\s+(\w+)', r'\1, \2'),  # Fix comma spacing
-            (r'(\w+)\s+\.\s+(\w+)', r'\1. \2'),  # Fix period spacing
-            (r'\s{2,}', ' '),  # Remove extra spaces
-            (r'([a-z])([A-Z])', r'\1 \2'),  # Fix missing space between sentences
+            (re.compile(pattern), replacement) for pattern, replacement in [
+                (r'(\d+)\.(\d+)', r'\1.\2'),  # Fix decimal numbers
+                (r'(\w+)\s+,\s+(\w+)', r'\1, \2'),  # Fix comma spacing
+                (r'(\w+)\s+\.\s+(\w+)', r'\1. \2'),  # Fix period spacing
+                (r'\s{2,}', ' '),  # Remove extra spaces
+                (r'([a-z])([A-Z])', r'\1 \2'),  # Fix missing space between sentences
+            ]
         ]
         
         # Initialize spaCy if available
         if SPACY_AVAILABLE and (enable_spell_check or enable_ner):
             try:
-                self.nlp = spacy.load("en_core_web_sm")
+                disabled = UNUSED_SPACY_PIPES if enable_ner else UNUSED_SPACY_PIPES + ['ner']
+                self.nlp = spacy.load("en_core_web_sm", disable=disabled)
                 logger.info("spaCy model loaded successfully")
             except Exception as e:
                 logger.warning(f"Failed to load spaCy model: {str(e)}")
@@ -64,7 +80,7 @@ class NLPProcessor:
         # Apply spaCy processing if available
         if self.nlp:
             try:
-                processed_text = self._apply_spacy_processing(processed_text)
+                processed_text = self._apply_spacy_processing(self.nlp(processed_text))
             except Exception as e:
                 logger.warning(f"spaCy processing failed: {str(e)}")
         
@@ -73,6 +89,40 @@ class NLPProcessor:
         
         return processed_text
     
+    def process_texts(self, texts, batch_size=32, n_process=1):
+        """
+        Process several texts, running them through spaCy as one batch.
+        
+        Args:
+            texts (list): The texts to process
+            batch_size (int): Number of texts spaCy buffers per batch
+            n_process (int): Number of processes spaCy uses for the batch
+            
+        Returns:
+            list: Processed texts in the same order as the input
+        """
+        results = list(texts)
+        indices = [i for i, text in enumerate(results) if text and text.strip()]
+        
+        # Fix common patterns
+        for i in indices:
+            results[i] = self._fix_patterns(results[i])
+        
+        # Apply spaCy processing if available
+        if self.nlp and indices:
+            try:
+                docs = self.nlp.pipe((results[i] for i in indices), batch_size=batch_size, n_process=n_process)
+                for i, doc in zip(indices, docs):
+                    results[i] = self._apply_spacy_processing(doc)
+            except Exception as e:
+                logger.warning(f"spaCy processing failed: {str(e)}")
+        
+        # Fix paragraphs and formatting
+        for i in indices:
+            results[i] = self._fix_paragraphs(results[i])
+        
+        return results
+    
     def _fix_patterns(self, text):
         """
         Fix common text patterns using regular expressions.
@@ -86,30 +136,35 @@ class NLPProcessor:
         processed = text
         
         for pattern, replacement in self.patterns:
-            processed = re.sub(pattern, replacement, processed)
+            processed = pattern.sub(replacement, processed)
             
         return processed
     
-    def _apply_spacy_processing(self, text):
+    def _apply_spacy_processing(self, doc):
         """
-        Apply spaCy NLP processing to the text.
+        Apply spaCy NLP processing to a parsed document.
         
         Args:
-            text (str): The text to process
+            doc (spacy.tokens.Doc): The parsed text
             
         Returns:
             str: Processed text
         """
-        doc = self.nlp(text)
+        text = doc.text
         
         # Named Entity Recognition
         if self.enable_ner:
-            # Preserve proper capitalization for named entities
+            # Preserve proper capitalization for named entities, rebuilding
+            # the text from entity spans in a single pass
+            parts = []
+            last = 0
             for ent in doc.ents:
-                # This is a simplified approach - in a real implementation,
-                # you would need to handle text replacement more carefully
-                if ent.label_ in ['PERSON', 'ORG', 'GPE', 'LOC']:
-                    text = text.replace(ent.text, self._ensure_proper_case(ent.text))
+                if ent.label_ in PROPER_CASE_ENTITY_LABELS:
+                    parts.append(text[last:ent.start_char])
+                    parts.append(self._ensure_proper_case(ent.text))
+                    last = ent.end_char
+            parts.append(text[last:])
+            text = ''.join(parts)
         
         # Spell checking would be implemented here in a real application
         # This is a placeholder for a more sophisticated implementation
@@ -140,10 +195,27 @@ class NLPProcessor:
             str: Processed text with improved paragraph structure
         """
         # Fix line breaks
-        text = re.sub(r'(?<!\n)\n(?!\n)', ' ', text)  # Single line breaks become spaces
-        text = re.sub(r'\n{3,}', '\n\n', text)  # Multiple line breaks become double
+        text = SINGLE_LINE_BREAK.sub(' ', text)  # Single line breaks become spaces
+        text = MULTIPLE_LINE_BREAKS.sub('\n\n', text)  # Multiple line breaks become double
         
         # Fix bullet points
-        text = re.sub(r'(?<=\n)[\s•-]*(?=•)', '', text)  # Clean up bullet points
+        text = BULLET_PREFIX.sub('', text)  # Clean up bullet points
         
-        return text
\ No newline at end of file
+        return text
+
+@functools.lru_cache(maxsize=None)
+def get_nlp_processor(enable_spell_check=True, enable_ner=True):
+    """
+    Get the shared NLP processor for the given settings.
+    
+    The spaCy model is loaded once per process and settings combination
+    instead of once per service instance.
+    
+    Args:
+        enable_spell_check (bool): Whether to enable spell checking
+        enable_ner (bool): Whether to enable named entity recognition
+        
+    Returns:
+        NLPProcessor: Shared NLP processor instance
+    """
+    return NLPProcessor(enable_spell_check=enable_spell_check, enable_ner=enable_ner)
\ No newline at end of file
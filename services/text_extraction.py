@@ -1,16 +1,28 @@
 """
 Text extraction service coordinating OCR and ML enhancement.
 """
+import io
 import os
 import time
 from PIL import Image
-import cv2
 import numpy as np
+import cv2
 import logging
-from services.nlp_processing import NLPProcessor
+from services.nlp_processing import get_nlp_processor
 
 logger = logging.getLogger(__name__)
 
+# File extensions handled as images
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif'})
+
+# Images larger than this on disk are candidates for decoding at half resolution
+REDUCED_DECODE_MIN_BYTES = 4 * 1024 * 1024
+
+# Minimum long side, in pixels, an image must keep after halving: about
+# 170 DPI across an A4 page, still enough for Tesseract. 12-20 MP phone
+# photos (4032-5472 px) qualify; a 300 DPI A4 scan (3508 px) is never halved
+REDUCED_DECODE_MIN_SIDE = 2000
+
 class TextExtractionService:
     """
     Service for coordinating text extraction from documents and images.
@@ -28,15 +40,14 @@ class TextExtractionService:
         self.ocr_model = ocr_model
         self.ml_model = ml_model
         self.preprocessor = preprocessor
-        self.nlp_processor = NLPProcessor()
+        self.nlp_processor = get_nlp_processor()
         
-        # File type handlers
+        # File type handlers (PDFs are handled page by page in _extract_pdf)
         self.file_handlers = {
-            'pdf': self._handle_pdf,
             'image': self._handle_image,
         }
     
-    def extract_text(self, file_path, source_lang='auto', enhance=True):
+    def extract_text(self, file_path, source_lang='auto', enhance=True, data=None):
         """
         Extract text from a file.
         
@@ -44,6 +55,8 @@ class TextExtractionService:
             file_path (str): Path to the file
             source_lang (str): Source language code (or 'auto' for detection)
             enhance (bool): Whether to apply ML enhancement
+            data (bytes, optional): Image contents already in memory, used
+                instead of reading the file back from disk
             
         Returns:
             tuple: (extracted_text, confidence_score)
@@ -54,12 +67,63 @@ class TextExtractionService:
         file_type = self._determine_file_type(file_path)
         
         # Extract text based on file type
-        if file_type in self.file_handlers:
-            text, confidence = self.file_handlers[file_type](file_path, source_lang)
+        if file_type == 'pdf':
+            text, confidence = self._extract_pdf(file_path, source_lang, enhance)
+        elif file_type in self.file_handlers:
+            text, confidence = self.file_handlers[file_type](file_path, source_lang, data)
+            text, confidence = self._refine_text(text, confidence, enhance)
         else:
             logger.error(f"Unsupported file type: {file_type}")
             return "Unsupported file type", 0.0
         
+        processing_time = time.time() - start_time
+        logger.info(f"Text extraction completed in {processing_time:.2f} seconds with confidence {confidence:.2f}")
+        
+        return text, confidence
+    
+    def iter_extract_text(self, file_path, source_lang='auto', enhance=True, data=None):
+        """
+        Extract text from a file page by page, yielding each page as it completes.
+        
+        PDF pages are not necessarily yielded in document order; images
+        yield a single page.
+        
+        Args:
+            file_path (str): Path to the file
+            source_lang (str): Source language code (or 'auto' for detection)
+            enhance (bool): Whether to apply ML enhancement
+            data (bytes, optional): Image contents already in memory, used
+                instead of reading the file back from disk
+            
+        Yields:
+            tuple: (page_index, extracted_text, confidence_score)
+        """
+        file_type = self._determine_file_type(file_path)
+        
+        if file_type == 'pdf':
+            pages = self.ocr_model.iter_pdf_pages(file_path, source_lang)
+        elif file_type in self.file_handlers:
+            pages = [(0, *self.file_handlers[file_type](file_path, source_lang, data))]
+        else:
+            logger.error(f"Unsupported file type: {file_type}")
+            pages = [(0, "Unsupported file type", 0.0)]
+        
+        for index, text, confidence in pages:
+            text, confidence = self._refine_text(text, confidence, enhance)
+            yield index, text, confidence
+    
+    def _refine_text(self, text, confidence, enhance):
+        """
+        Apply ML enhancement and NLP processing to extracted text.
+        
+        Args:
+            text (str): Extracted text
+            confidence (float): OCR confidence score
+            enhance (bool): Whether to apply ML enhancement
+            
+        Returns:
+            tuple: (refined_text, confidence_score)
+        """
         # Apply ML enhancement if requested
         if enhance and self.ml_model:
             text, confidence = self.ml_model.enhance_text(text, confidence)
@@ -67,9 +131,6 @@ class TextExtractionService:
         # Apply NLP processing
         text = self.nlp_processor.process_text(text)
         
-        processing_time = time.time() - start_time
-        logger.info(f"Text extraction completed in {processing_time:.2f} seconds with confidence {confidence:.2f}")
-        
         return text, confidence
     
     def _determine_file_type(self, file_path):
@@ -87,44 +148,59 @@ class TextExtractionService:
         
         if ext == '.pdf':
             return 'pdf'
-        elif ext in ['.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif']:
+        elif ext in IMAGE_EXTENSIONS:
             return 'image'
         else:
             return 'unknown'
     
-    def _handle_pdf(self, file_path, lang):
+    def _extract_pdf(self, file_path, lang, enhance):
         """
-        Handle text extraction from PDF files.
+        Extract and refine text from a PDF file.
+        
+        Pages are refined individually, as iter_extract_text does, with NLP
+        processing run over all pages as a single spaCy batch.
         
         Args:
             file_path (str): Path to the PDF file
             lang (str): Language code
+            enhance (bool): Whether to apply ML enhancement
             
         Returns:
             tuple: (extracted_text, confidence_score)
         """
-        return self.ocr_model.extract_text_from_pdf(file_path, lang)
+        texts = []
+        confidences = []
+        
+        # Pages arrive out of order; sort them back into document order
+        for _, text, confidence in sorted(self.ocr_model.iter_pdf_pages(file_path, lang)):
+            if enhance and self.ml_model:
+                text, confidence = self.ml_model.enhance_text(text, confidence)
+            texts.append(text)
+            confidences.append(confidence)
+        
+        texts = self.nlp_processor.process_texts(texts)
+        
+        return '\n\n'.join(texts), float(np.mean(confidences)) if confidences else 0.0
     
-    def _handle_image(self, file_path, lang):
+    def _handle_image(self, file_path, lang, data=None):
         """
         Handle text extraction from image files.
         
         Args:
             file_path (str): Path to the image file
             lang (str): Language code
+            data (bytes, optional): Encoded image already in memory
             
         Returns:
             tuple: (extracted_text, confidence_score)
         """
         try:
-            # Load image
-            image = Image.open(file_path)
+            # Load image as a grayscale array, decoding in-memory uploads directly
+            gray = self._load_image(file_path, data)
             
-            # Preprocess image
-            preprocessed = self.preprocessor.preprocess(image)
-            
-            # Deskew image if needed
-            deskewed = self.preprocessor.deskew(preprocessed)
+            # Preprocess and deskew the array without round-tripping through PIL
+            preprocessed = self.preprocessor.preprocess_array(gray)
+            deskewed = self.preprocessor.deskew_array(preprocessed)
             
             # Extract text using OCR
             text, confidence = self.ocr_model.extract_text_from_image(deskewed, lang)
@@ -133,4 +209,57 @@ class TextExtractionService:
             
         except Exception as e:
             logger.error(f"Image processing failed: {str(e)}")
-            return "Image processing failed", 0.0
\ No newline at end of file
+            return "Image processing failed", 0.0
+    
+    def _load_image(self, file_path, data=None):
+        """
+        Load an image as a grayscale array, from memory if available, otherwise from disk.
+        
+        Args:
+            file_path (str): Path to the image file
+            data (bytes, optional): Encoded image already in memory
+            
+        Returns:
+            numpy.ndarray: Grayscale image array
+        """
+        # Decode oversized images at half resolution, which libjpeg does almost
+        # for free and which quarters the pixels every later step processes
+        flags = cv2.IMREAD_GRAYSCALE
+        if self._should_reduce(file_path, data):
+            flags = cv2.IMREAD_REDUCED_GRAYSCALE_2
+        
+        if data:
+            image = cv2.imdecode(np.frombuffer(data, np.uint8), flags)
+        else:
+            image = cv2.imread(file_path, flags)
+        
+        if image is not None:
+            return image
+        
+        # OpenCV cannot decode every format (e.g. GIF), so fall back to PIL
+        with Image.open(io.BytesIO(data) if data else file_path) as pil_image:
+            return np.asarray(pil_image.convert('L'))
+    
+    def _should_reduce(self, file_path, data=None):
+        """
+        Check whether an image is large enough to decode at half resolution.
+        
+        Only the file size and the image header are inspected, so the check
+        does not decode any pixels.
+        
+        Args:
+            file_path (str): Path to the image file
+            data (bytes, optional): Encoded image already in memory
+            
+        Returns:
+            bool: True if the image keeps enough resolution for OCR when halved
+        """
+        size = len(data) if data else os.path.getsize(file_path)
+        if size <= REDUCED_DECODE_MIN_BYTES:
+            return False
+        
+        try:
+            with Image.open(io.BytesIO(data) if data else file_path) as header:
+                return max(header.size) // 2 >= REDUCED_DECODE_MIN_SIDE
+        except Exception:
+            return False
\ No newline at end of file
@@ -2,6 +2,7 @@
 Translation service for coordinating text translation.
 """
 import logging
+from utils.request_batcher import RequestBatcher
 
 logger = logging.getLogger(__name__)
 
@@ -10,14 +11,26 @@ class TranslationService:
     Service for coordinating text translation operations.
     """
     
-    def __init__(self, translation_model):
+    def __init__(self, translation_model, batch_size=1, max_latency=0.05):
         """
         Initialize the translation service.
         
         Args:
             translation_model: Translation model instance
+            batch_size (int): Maximum number of concurrent requests coalesced
+                into one translation call (1 disables batching)
+            max_latency (float): Maximum time in seconds a request waits for a batch to fill
         """
         self.translation_model = translation_model
+        self.batcher = None
+        
+        # Coalesce concurrent requests with the same language pair
+        if batch_size > 1:
+            self.batcher = RequestBatcher(
+                self._translate_batch,
+                batch_size=batch_size,
+                max_latency=max_latency
+            )
     
     def translate(self, text, source_lang='auto', target_lang='en'):
         """
@@ -34,6 +47,11 @@ class TranslationService:
         if not text or not text.strip():
             return text
             
+        # Text without letters (numbers, codes, punctuation) reads the same in
+        # every language, so skip detection and translation entirely
+        if not any(char.isalpha() for char in text):
+            return text
+            
         # Detect language if set to auto
         if source_lang == 'auto':
             detected_lang = self.detect_language(text)
@@ -44,7 +62,10 @@ class TranslationService:
         if source_lang == target_lang:
             return text
             
-        # Translate the text
+        # Translate the text, batched with concurrent requests if enabled
+        if self.batcher:
+            return self.batcher.submit((source_lang, target_lang), text)
+            
         translated = self.translation_model.translate(
             text,
             source_lang=source_lang,
@@ -53,6 +74,24 @@ class TranslationService:
         
         return translated
     
+    def _translate_batch(self, language_pair, texts):
+        """
+        Translate a batch of texts sharing a language pair.
+        
+        Args:
+            language_pair (tuple): (source_lang, target_lang)
+            texts (list): Texts to translate
+            
+        Returns:
+            list: Translated texts
+        """
+        source_lang, target_lang = language_pair
+        return self.translation_model.translate_batch(
+            texts,
+            source_lang=source_lang,
+            target_lang=target_lang
+        )
+    
     def detect_language(self, text):
         """
         Detect the language of the input text.
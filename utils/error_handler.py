@@ -3,6 +3,7 @@ Error handling utility for the application.
 """
 import traceback
 import logging
+import concurrent.futures
 from flask import jsonify
 
 logger = logging.getLogger(__name__)
@@ -31,6 +32,10 @@ def handle_error(error, is_api=False):
     elif isinstance(error, PermissionError):
         message = "Permission denied"
         status_code = 403
+    elif isinstance(error, (TimeoutError, concurrent.futures.TimeoutError)):
+        # concurrent.futures.TimeoutError is only an alias of TimeoutError from Python 3.11
+        message = "Processing timed out"
+        status_code = 504
     else:
         message = "An unexpected error occurred"
         status_code = 500
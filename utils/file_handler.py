@@ -4,11 +4,18 @@ File handler utility for managing file uploads and downloads.
 import os
 import uuid
 import shutil
+import tempfile
 from werkzeug.utils import secure_filename
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Chunk size used when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# File extensions accepted when none are configured
+DEFAULT_ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'pdf', 'tiff', 'bmp'})
+
 class FileHandler:
     """
     Utility for handling file uploads, downloads, and management.
@@ -23,7 +30,7 @@ class FileHandler:
             allowed_extensions (set, optional): Set of allowed file extensions
         """
         self.upload_folder = upload_folder
-        self.allowed_extensions = allowed_extensions or {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'tiff', 'bmp'}
+        self.allowed_extensions = frozenset(allowed_extensions or DEFAULT_ALLOWED_EXTENSIONS)
         
         # Create upload folder if it doesn't exist
         os.makedirs(upload_folder, exist_ok=True)
@@ -38,7 +45,8 @@ class FileHandler:
         Returns:
             bool: True if the file extension is allowed, False otherwise
         """
-        return '.' in filename and filename.rsplit('.', 1)[1].lower() in self.allowed_extensions
+        dot = filename.rfind('.')
+        return dot != -1 and filename[dot + 1:].lower() in self.allowed_extensions
     
     def save_upload(self, file_obj):
         """
@@ -47,6 +55,41 @@ class FileHandler:
         Args:
             file_obj: File object from request.files
             
+        Returns:
+            str: Path to the saved file
+        """
+        # Stream the upload to disk in chunks
+        return self._write_upload(
+            file_obj,
+            lambda temp_file: shutil.copyfileobj(file_obj.stream, temp_file, length=UPLOAD_CHUNK_SIZE)
+        )
+    
+    def save_upload_with_data(self, file_obj):
+        """
+        Save an uploaded file to the upload folder, keeping its contents in memory.
+        
+        The upload is read once and written to disk from memory, so callers
+        that process the contents do not have to read the file back.
+        
+        Args:
+            file_obj: File object from request.files
+            
+        Returns:
+            tuple: (path to the saved file, file contents as bytes)
+        """
+        data = file_obj.stream.read() if file_obj else None
+        file_path = self._write_upload(file_obj, lambda temp_file: temp_file.write(data))
+        
+        return file_path, data
+    
+    def _write_upload(self, file_obj, write):
+        """
+        Validate an uploaded file and write it to the upload folder.
+        
+        Args:
+            file_obj: File object from request.files
+            write (callable): Writes the upload's contents to the given file
+            
         Returns:
             str: Path to the saved file
         """
@@ -56,7 +99,17 @@ class FileHandler:
             filename = f"{uuid.uuid4()}_{original_filename}"
             file_path = os.path.join(self.upload_folder, filename)
             
-            file_obj.save(file_path)
+            # Write to a temporary file, then move it into place so a
+            # partially written file is never visible
+            with tempfile.NamedTemporaryFile(dir=self.upload_folder, suffix='.part', delete=False) as temp_file:
+                try:
+                    write(temp_file)
+                except Exception:
+                    temp_file.close()
+                    os.remove(temp_file.name)
+                    raise
+            os.replace(temp_file.name, file_path)
+            
             logger.info(f"Saved uploaded file: {file_path}")
             
             return file_path
@@ -81,12 +134,12 @@ class FileHandler:
         
         # Generate a unique filename for the result
         base_name = os.path.splitext(secure_filename(original_filename))[0]
-        result_filename = f"{base_name}_result_{uuid.uuid4()}.txt"
+        result_filename = f"{base_name}_result_{uuid.uuid4().hex[:12]}.txt"
         result_path = os.path.join(result_folder, result_filename)
         
-        # Save the result
-        with open(result_path, 'w', encoding='utf-8') as f:
-            f.write(result_data)
+        # Save the result, encoded up front so it is written in a single call
+        with open(result_path, 'wb') as f:
+            f.write(result_data.encode('utf-8'))
             
         logger.info(f"Saved result file: {result_path}")
         
@@ -105,19 +158,20 @@ class FileHandler:
         current_time = time.time()
         max_age_seconds = max_age_hours * 3600
         
-        for filename in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, filename)
-            
-            # Skip if not a file
-            if not os.path.isfile(file_path):
-                continue
+        # Directory entries carry the file type, and cache their stat result,
+        # so each file costs at most one stat call
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                # Skip if not a file
+                if not entry.is_file():
+                    continue
+                    
+                # Check file age
+                file_age = current_time - entry.stat().st_mtime
                 
-            # Check file age
-            file_age = current_time - os.path.getmtime(file_path)
-            
-            if file_age > max_age_seconds:
-                try:
-                    os.remove(file_path)
-                    logger.info(f"Removed old file: {file_path}")
-                except Exception as e:
-                    logger.error(f"Failed to remove old file {file_path}: {str(e)}")
\ No newline at end of file
+                if file_age > max_age_seconds:
+                    try:
+                        os.remove(entry.path)
+                        logger.info(f"Removed old file: {entry.path}")
+                    except Exception as e:
+                        logger.error(f"Failed to remove old file {entry.path}: {str(e)}")
\ No newline at end of file
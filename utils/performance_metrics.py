@@ -3,17 +3,118 @@ Performance metrics tracking utility.
 """
 import time
 import functools
+import threading
+from collections import deque
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Number of most recent processing times kept for inspection
+PROCESSING_TIME_WINDOW = 1000
+
+# Guards every update to performance_data, which is shared by all request threads
+_lock = threading.Lock()
+
 # Dictionary to store performance metrics
 performance_data = {
     'total_requests': 0,
     'total_processing_time': 0,
     'successful_requests': 0,
     'failed_requests': 0,
-    'avg_processing_time': 0,
+    'avg_processing_time': 0.0,
     'requests_by_endpoint': {},
-    'processing_times': []
-}
\ No newline at end of file
+    'processing_times': deque(maxlen=PROCESSING_TIME_WINDOW)
+}
+
+def record_request(endpoint, processing_time, success):
+    """
+    Record the outcome of a single request.
+    
+    Args:
+        endpoint (str): Name of the endpoint that handled the request
+        processing_time (float): Time taken to handle the request, in seconds
+        success (bool): Whether the request succeeded
+    """
+    with _lock:
+        performance_data['total_requests'] += 1
+        performance_data['total_processing_time'] += processing_time
+        if success:
+            performance_data['successful_requests'] += 1
+        else:
+            performance_data['failed_requests'] += 1
+        
+        # Welford's online mean keeps the average exact without rescanning samples
+        count = performance_data['total_requests']
+        performance_data['avg_processing_time'] += (processing_time - performance_data['avg_processing_time']) / count
+        
+        requests_by_endpoint = performance_data['requests_by_endpoint']
+        requests_by_endpoint[endpoint] = requests_by_endpoint.get(endpoint, 0) + 1
+        performance_data['processing_times'].append(processing_time)
+
+def get_performance_data():
+    """
+    Get a consistent snapshot of the collected metrics.
+    
+    Returns:
+        dict: Copy of the performance metrics
+    """
+    with _lock:
+        snapshot = dict(performance_data)
+        snapshot['requests_by_endpoint'] = dict(performance_data['requests_by_endpoint'])
+        snapshot['processing_times'] = list(performance_data['processing_times'])
+    
+    return snapshot
+
+def track_performance(func):
+    """
+    Decorator recording the processing time and outcome of a Flask view.
+    
+    A request counts as failed if the view raises or returns an error status.
+    Streamed responses are timed until the stream has been sent and closed.
+    
+    Args:
+        func (callable): View function to track
+    
+    Returns:
+        callable: Wrapped view function
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start_time = time.perf_counter()
+        
+        def record(success):
+            processing_time = time.perf_counter() - start_time
+            record_request(func.__name__, processing_time, success)
+            logger.debug(f"{func.__name__} completed in {processing_time:.3f} seconds")
+        
+        try:
+            response = func(*args, **kwargs)
+        except Exception:
+            record(False)
+            raise
+        
+        success = _response_status(response) < 400
+        
+        # The body of a streamed response is produced after the view returns
+        if getattr(response, 'is_streamed', False):
+            response.call_on_close(lambda: record(success))
+        else:
+            record(success)
+        
+        return response
+    
+    return wrapper
+
+def _response_status(response):
+    """
+    Get the HTTP status code of a view's return value.
+    
+    Args:
+        response: Response object, or a (body, status) tuple
+    
+    Returns:
+        int: HTTP status code
+    """
+    if isinstance(response, tuple) and len(response) > 1 and isinstance(response[1], int):
+        return response[1]
+    return getattr(response, 'status_code', 200)
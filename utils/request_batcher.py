@@ -0,0 +1,96 @@
+"""
+Dynamic request batching utility.
+"""
+import time
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RequestBatcher:
+    """
+    Coalesces concurrent requests that share a key into batched backend calls.
+    
+    Requests are queued and collected until either `batch_size` requests are
+    pending or `max_latency` seconds have passed since the first one arrived.
+    Requests are then grouped by key and each group is handed to the handler
+    as a single call.
+    """
+    
+    def __init__(self, handler, batch_size=16, max_latency=0.05, max_concurrency=4):
+        """
+        Initialize the request batcher.
+        
+        Args:
+            handler (callable): Function called as handler(key, items) that
+                returns a list of results in the same order as items
+            batch_size (int): Maximum number of requests collected per batch
+            max_latency (float): Maximum time in seconds to wait for a batch to fill
+            max_concurrency (int): Maximum number of batches handled at once
+        """
+        self.handler = handler
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='batch')
+        
+        self._collector = threading.Thread(target=self._collect, name='request-batcher', daemon=True)
+        self._collector.start()
+    
+    def submit(self, key, item):
+        """
+        Submit a request and wait for its result.
+        
+        Args:
+            key (hashable): Requests are only batched with others sharing this key
+            item: The request payload passed to the handler
+        
+        Returns:
+            The handler's result for this item
+        """
+        future = Future()
+        self._queue.put((key, item, future))
+        return future.result()
+    
+    def _collect(self):
+        """Collect queued requests into batches and dispatch them."""
+        while True:
+            key, item, future = self._queue.get()
+            pending = {key: [(item, future)]}
+            count = 1
+            deadline = time.monotonic() + self.max_latency
+            
+            while count < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    key, item, future = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.setdefault(key, []).append((item, future))
+                count += 1
+            
+            for key, entries in pending.items():
+                self._executor.submit(self._dispatch, key, entries)
+    
+    def _dispatch(self, key, entries):
+        """
+        Run the handler for one batch and resolve the waiting requests.
+        
+        Args:
+            key (hashable): Key shared by every request in the batch
+            entries (list): (item, future) pairs
+        """
+        try:
+            results = self.handler(key, [item for item, _ in entries])
+        except Exception as e:
+            logger.error(f"Batched request failed: {str(e)}")
+            for _, future in entries:
+                future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(entries, results):
+            future.set_result(result)
\ No newline at end of file